@@ -1,11 +1,25 @@
 import os
 import sys
+import asyncio
 
 # Ensure root directory is in sys.path so 'backend' package can be imported
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 try:
-    from backend.main import app
+    from backend.main import app as _asgi_app, job_queue
+
+    # 在 drain 中等待后台任务的最长秒数，应小于函数的 maxDuration
+    DRAIN_TIMEOUT = float(os.environ.get("JOB_DRAIN_TIMEOUT", "5"))
+
+    async def app(scope, receive, send):
+        await _asgi_app(scope, receive, send)
+        # @vercel/python 的 ASGI 适配器会缓冲响应，等 app 协程结束后才返回给客户端，
+        # 实例随后可能被冻结，没有"响应之后"的执行时间。所以这里把后台任务执行完，
+        # 代价是提交任务的那个请求（如索引重建）要等任务完成才收到响应；
+        # 没有任务的请求直接跳过。drain 是阻塞调用，放到线程中以免卡住事件循环。
+        if scope["type"] == "http" and job_queue.has_work():
+            if not await asyncio.to_thread(job_queue.drain, DRAIN_TIMEOUT):
+                print(f"Job drain timed out after {DRAIN_TIMEOUT}s, unfinished jobs: {job_queue.unfinished()}")
 except Exception:
     import traceback
     from http.server import BaseHTTPRequestHandler
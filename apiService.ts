@@ -8,10 +8,31 @@ import type {
   SystemConfig,
   DashboardStats,
   IngredientLibraryItem,
+  BootstrapPayload,
 } from './types';
 
 const API_BASE = '/api';
 
+// ==================== 启动数据 API ====================
+
+/** 一次请求获取启动所需数据，未传的部分默认返回菜品、原材料库和供应商 */
+export async function fetchBootstrap(options: {
+  dishes?: boolean;
+  suppliers?: boolean;
+  ingredients?: boolean;
+  configs?: string[];
+} = {}): Promise<BootstrapPayload> {
+  const params = new URLSearchParams();
+  if (options.dishes === false) params.append('dishes', 'false');
+  if (options.suppliers === false) params.append('suppliers', 'false');
+  if (options.ingredients === false) params.append('ingredients', 'false');
+  (options.configs ?? []).forEach((id) => params.append('configs', id));
+  const query = params.toString();
+  const res = await fetch(`${API_BASE}/bootstrap${query ? `?${query}` : ''}`);
+  if (!res.ok) throw new Error('获取启动数据失败');
+  return res.json();
+}
+
 // ==================== 菜品 API ====================
 
 export async function fetchDishes(): Promise<Dish[]> {
@@ -50,6 +71,10 @@ export async function deleteDish(dishId: string): Promise<{ message: string }> {
   const res = await fetch(`${API_BASE}/dishes/${dishId}`, {
     method: 'DELETE',
   });
+  if (res.status === 409) {
+    const body = await res.json();
+    throw new Error(body.detail || '菜品仍被订单引用');
+  }
   if (!res.ok) throw new Error('删除菜品失败');
   return res.json();
 }
@@ -0,0 +1,125 @@
+"""
+压缩基准 — 典型响应体的 CPU 耗时与节省字节数
+
+运行方式: python bench_compression.py
+不依赖 Firestore，使用按真实数据结构生成的模拟数据。
+"""
+import gzip
+import json
+import random
+import time
+
+from compression import (
+    GZIP_LEVEL, GZIP_LEVEL_CACHED, BROTLI_QUALITY, BROTLI_QUALITY_CACHED, brotli,
+)
+
+RUNS = 20
+
+_DESCRIPTIONS = [
+    "皮薄馅大，每日现包，选用农家前夹肉，肥瘦相间，咬一口满嘴流油",
+    "五谷杂粮，暖胃首选，小火慢熬两个小时，米油浓稠，老人小孩都爱喝",
+    "秘方卤制，入味十足，八角桂皮香叶等十余种香料，卤汁循环使用多年",
+    "坝坝宴必备硬菜，选用土猪五花肉，蒸足三个小时，肥而不腻，入口即化",
+    "乡村流水席经典凉菜，红油现炒，麻辣鲜香，配米饭下酒都合适",
+]
+_CATEGORIES = ["主食点心", "汤菜", "小食", "凉菜", "热菜", "蒸菜"]
+_INGREDIENTS = [("猪肉", "肉类"), ("面粉", "其他"), ("大葱", "菜类"), ("生抽", "佐料类"),
+                ("小米", "其他"), ("鸡蛋", "蛋类"), ("豆瓣酱", "佐料类"), ("土豆", "菜类")]
+
+
+def make_dishes(count: int) -> list[dict]:
+    rng = random.Random(1)
+    return [
+        {
+            "id": f"dish-{i}",
+            "name": f"招牌菜{i}",
+            "description": rng.choice(_DESCRIPTIONS),
+            "price": round(rng.uniform(1, 120), 1),
+            "category": rng.choice(_CATEGORIES),
+            "imageUrl": f"https://storage.googleapis.com/pingjiejia/dish-images/{rng.getrandbits(128):032x}.jpg",
+            "ingredients": [
+                {"libId": f"lib-{n}", "name": name, "amount": f"{rng.randint(5, 500)}g", "category": cat}
+                for n, (name, cat) in enumerate(rng.sample(_INGREDIENTS, 4))
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def make_orders(count: int, days: int, dishes_per_slot: int) -> list[dict]:
+    rng = random.Random(2)
+    orders = []
+    for i in range(count):
+        plans = []
+        for d in range(days):
+            slots = {
+                meal: {
+                    "type": meal,
+                    "tableCount": rng.randint(5, 40),
+                    "dishes": [{"dishId": f"dish-{rng.randint(0, 79)}", "quantity": rng.randint(1, 3)}
+                               for _ in range(dishes_per_slot)],
+                }
+                for meal in ("lunch", "dinner")
+            }
+            plans.append({"date": f"2026-10-{d + 1:02d}", "slots": slots})
+        orders.append({
+            "id": f"ord-{1760000000000 + i}",
+            "orderNumber": f"#CRT-{rng.randint(10000, 99999)}",
+            "customerName": f"客户{i}",
+            "customerPhone": f"138{rng.randint(10000000, 99999999)}",
+            "eventReason": rng.choice(["婚宴", "寿宴", "升学宴", "乔迁宴"]),
+            "address": "四川省成都市郫都区某某镇某某村三组",
+            "daysCount": days,
+            "startDate": "2026-10-01",
+            "status": rng.choice(["待执行", "已完成"]),
+            "plans": plans,
+        })
+    return orders
+
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _time(fn, body: bytes) -> tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        size = len(fn(body))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, size
+
+
+def main():
+    payloads = {
+        "单个订单 (7天×2餐×10菜)": make_orders(1, 7, 10)[0],
+        "菜品列表 (80道)": make_dishes(80),
+        "订单列表 (30单×3天×2餐×8菜)": make_orders(30, 3, 8),
+        "订单列表 (100单×5天×2餐×10菜)": make_orders(100, 5, 10),
+    }
+    codecs = [
+        (f"gzip-{GZIP_LEVEL} (实时)", lambda b: gzip.compress(b, compresslevel=GZIP_LEVEL, mtime=0)),
+        (f"gzip-{GZIP_LEVEL_CACHED} (缓存)", lambda b: gzip.compress(b, compresslevel=GZIP_LEVEL_CACHED, mtime=0)),
+    ]
+    if brotli is not None:
+        codecs += [
+            (f"br-{BROTLI_QUALITY} (实时)", lambda b: brotli.compress(b, quality=BROTLI_QUALITY)),
+            (f"br-{BROTLI_QUALITY_CACHED} (缓存)", lambda b: brotli.compress(b, quality=BROTLI_QUALITY_CACHED)),
+        ]
+    else:
+        print("未安装 brotli，仅测试 gzip\n")
+
+    for label, payload in payloads.items():
+        body = _encode(payload)
+        print(f"{label}: 原始 {len(body):,} 字节")
+        for name, fn in codecs:
+            ms, size = _time(fn, body)
+            saved = len(body) - size
+            print(f"  {name:<16} {ms:8.2f} ms  {size:>9,} 字节  节省 {saved / len(body):6.1%}"
+                  f"  ({saved / 1024 / ms if ms else 0:,.0f} KB/ms)")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+菜品 → 订单 反向索引
+
+dish_usage/{dishId} 文档保存引用该菜品的订单 ID 列表 (orderIds)，
+由订单写接口在同一个 batch / 事务中增量维护，用于安全删除菜品和影响范围查询。
+索引只作为候选集合：读取时会用订单实际的 plans 校验，残留的过期 ID 不影响结果。
+历史订单需运行一次 rebuild() 补全；完成后写入标记文档 dish_usage/_meta，
+在此之前 referencing_orders() 退回到全量扫描订单。
+"""
+from typing import Callable, Optional
+from firebase_admin import firestore
+from firebase_client import db
+
+COLLECTION = "dish_usage"
+ORDERS_COLLECTION = "orders"
+# rebuild() 完成后写入的标记文档
+META_DOC = "_meta"
+
+# Firestore 单个 batch 最多 500 个写操作
+_BATCH_LIMIT = 500
+
+
+def dish_ids_in_plans(plans) -> set[str]:
+    """提取订单排期中引用的全部 dishId（plans 可为 DayPlan 模型或 dict）"""
+    ids = set()
+    for plan in plans or []:
+        if hasattr(plan, "model_dump"):
+            plan = plan.model_dump()
+        slots = plan.get("slots") or {}
+        for slot in slots.values():
+            for item in (slot or {}).get("dishes") or []:
+                if item.get("dishId"):
+                    ids.add(item["dishId"])
+    return ids
+
+
+def apply_order_change(batch, order_id: str, old_ids: set[str], new_ids: set[str]) -> None:
+    """把订单引用菜品的变化写入 batch 或事务（与订单本身的写入一起提交）"""
+    for dish_id in new_ids - old_ids:
+        batch.set(
+            db.collection(COLLECTION).document(dish_id),
+            {"orderIds": firestore.ArrayUnion([order_id])},
+            merge=True,
+        )
+    for dish_id in old_ids - new_ids:
+        batch.set(
+            db.collection(COLLECTION).document(dish_id),
+            {"orderIds": firestore.ArrayRemove([order_id])},
+            merge=True,
+        )
+
+
+def get_order_ids(dish_id: str) -> list[str]:
+    """引用该菜品的订单 ID"""
+    doc = db.collection(COLLECTION).document(dish_id).get()
+    if not doc.exists:
+        return []
+    return doc.to_dict().get("orderIds", [])
+
+
+# 标记文档只会被写入不会被删除，看到一次后本进程内不再检查
+_index_ready = False
+
+
+def index_ready() -> bool:
+    """历史订单是否已通过 rebuild() 补全到索引"""
+    global _index_ready
+    if not _index_ready:
+        _index_ready = db.collection(COLLECTION).document(META_DOC).get().exists
+    return _index_ready
+
+
+def referencing_orders(dish_id: str) -> list[dict]:
+    """读取引用该菜品的订单（已删除或已不再引用该菜品的订单会被跳过）。
+    索引尚未补全时全量扫描订单，避免漏掉历史订单。"""
+    if index_ready():
+        order_ids = get_order_ids(dish_id)
+        if not order_ids:
+            return []
+        refs = [db.collection(ORDERS_COLLECTION).document(oid) for oid in order_ids]
+        orders = [doc.to_dict() for doc in db.get_all(refs) if doc.exists]
+    else:
+        orders = [doc.to_dict() for doc in db.collection(ORDERS_COLLECTION).stream()]
+    return [o for o in orders if dish_id in dish_ids_in_plans(o.get("plans"))]
+
+
+def rebuild(progress: Optional[Callable[..., None]] = None) -> int:
+    """全量扫描订单补全索引（历史订单迁移用），返回涉及的菜品数。
+    只用 ArrayUnion 合并写入，不覆盖、不删除，与并发的订单写入不冲突。
+    progress 为后台任务的进度回调（见 jobs.Job.report）。"""
+    report = progress or (lambda **_: None)
+    usage: dict[str, list[str]] = {}
+    scanned = 0
+    for doc in db.collection(ORDERS_COLLECTION).stream():
+        order = doc.to_dict()
+        for dish_id in dish_ids_in_plans(order.get("plans")):
+            usage.setdefault(dish_id, []).append(doc.id)
+        scanned += 1
+        if scanned % 100 == 0:
+            report(stage="scanning", ordersScanned=scanned)
+
+    items = list(usage.items())
+    report(stage="writing", ordersScanned=scanned, dishes=len(items), dishesWritten=0)
+    for start in range(0, len(items), _BATCH_LIMIT):
+        batch = db.batch()
+        for dish_id, ids in items[start:start + _BATCH_LIMIT]:
+            batch.set(
+                db.collection(COLLECTION).document(dish_id),
+                {"orderIds": firestore.ArrayUnion(ids)},
+                merge=True,
+            )
+        batch.commit()
+        report(dishesWritten=min(start + _BATCH_LIMIT, len(items)))
+    db.collection(COLLECTION).document(META_DOC).set({"rebuiltAt": firestore.SERVER_TIMESTAMP})
+    report(stage="done")
+    return len(usage)
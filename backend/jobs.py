@@ -0,0 +1,232 @@
+"""
+进程内后台任务队列
+
+把耗时的后台操作（如菜品引用索引重建）交给固定数量的 asyncio worker 执行，
+请求处理函数可以立即返回任务 ID，通过 /api/admin/jobs/{id} 查询进度。失败的任务按指数退避重试。
+Serverless 环境下函数返回后可能被冻结，入口需调用同步的 drain() 把剩余任务执行完。
+"""
+import os
+import time
+import uuid
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Optional
+
+WORKER_COUNT = int(os.environ.get("JOB_WORKERS", "2"))
+MAX_PENDING = int(os.environ.get("JOB_MAX_PENDING", "100"))
+MAX_ATTEMPTS = 3
+BACKOFF_SECONDS = 0.5
+# 状态接口最多保留的任务记录数
+HISTORY_SIZE = 200
+
+
+class Job:
+    """一个后台任务（fn 为同步函数，在线程中执行）"""
+
+    def __init__(self, name: str, fn: Callable[..., Any], args: tuple, with_progress: bool = False):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.with_progress = with_progress
+        self.status = "queued"  # queued / running / retrying / succeeded / failed / rejected
+        self.attempts = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.not_before = 0.0  # 重试时最早可执行的 monotonic 时间
+        self.progress: dict = {}
+
+    def report(self, **fields) -> None:
+        """任务执行中上报进度（如已扫描数量），状态接口原样返回"""
+        self.progress = {**self.progress, **fields}
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "progress": self.progress,
+            "createdAt": self.created_at,
+            "finishedAt": self.finished_at,
+        }
+
+
+class JobQueue:
+    """有界任务队列：asyncio worker 消费，drain() 供同步入口兜底"""
+
+    def __init__(self, workers: int = WORKER_COUNT, max_pending: int = MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending: deque[Job] = deque()
+        self._active = 0
+        self._cond = threading.Condition()
+        self._history: OrderedDict[str, Job] = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: list[asyncio.Task] = []
+
+    # ---------- 提交 ----------
+
+    def submit(self, name: str, fn: Callable[..., Any], *args, with_progress: bool = False) -> Job:
+        """提交任务；队列已满（排队 + 执行中达到 max_pending）时不入队，
+        返回状态为 rejected 的任务，由调用方决定丢弃还是自行执行。
+        with_progress=True 时以关键字参数 progress=job.report 调用 fn。"""
+        job = Job(name, fn, args, with_progress)
+        with self._cond:
+            self._remember(job)
+            if len(self._pending) + self._active >= self.max_pending:
+                job.status = "rejected"
+                job.finished_at = time.time()
+                return job
+            self._pending.append(job)
+        self._ensure_workers()
+        self._notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            return self._history.get(job_id)
+
+    def has_work(self) -> bool:
+        """是否还有排队或执行中的任务"""
+        with self._cond:
+            return bool(self._pending) or self._active > 0
+
+    def unfinished(self) -> list[dict]:
+        """排队或执行中的任务（drain 超时时用于记录日志）"""
+        with self._cond:
+            return [job.to_dict() for job in self._history.values()
+                    if job.status in ("queued", "running", "retrying")]
+
+    def stats(self) -> dict:
+        with self._cond:
+            counts: dict[str, int] = {}
+            for job in self._history.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                "workers": self.workers,
+                "pending": len(self._pending),
+                "running": self._active,
+                "maxPending": self.max_pending,
+                "counts": counts,
+                "recent": [job.to_dict() for job in reversed(self._history.values())][:20],
+            }
+
+    # ---------- 同步兜底 ----------
+
+    def drain(self, timeout: float = 5.0) -> bool:
+        """在当前线程执行所有剩余任务（含等待重试）并等待执行中的任务结束。
+        全部完成返回 True，超时返回 False。"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self._take_ready()
+            if job is not None:
+                self._execute(job)
+                continue
+            with self._cond:
+                if not self._pending and self._active == 0:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = remaining
+                if self._pending:
+                    next_ready = min(j.not_before for j in self._pending)
+                    wait = min(wait, max(next_ready - time.monotonic(), 0.01))
+                self._cond.wait(wait)
+
+    # ---------- 内部实现 ----------
+
+    def _remember(self, job: Job) -> None:
+        self._history[job.id] = job
+        while len(self._history) > HISTORY_SIZE:
+            self._history.popitem(last=False)
+
+    def _take_ready(self) -> Optional[Job]:
+        now = time.monotonic()
+        with self._cond:
+            for job in self._pending:
+                if job.not_before <= now:
+                    self._pending.remove(job)
+                    self._active += 1
+                    return job
+            return None
+
+    def _next_delay(self) -> Optional[float]:
+        with self._cond:
+            if not self._pending:
+                return None
+            return max(min(j.not_before for j in self._pending) - time.monotonic(), 0.0)
+
+    def _execute(self, job: Job) -> None:
+        """执行一次任务（同步）；调用前须已计入 _active"""
+        job.status = "running"
+        job.attempts += 1
+        try:
+            if job.with_progress:
+                job.fn(*job.args, progress=job.report)
+            else:
+                job.fn(*job.args)
+            job.status = "succeeded"
+            job.error = None
+            job.finished_at = time.time()
+        except Exception as e:
+            job.error = str(e)
+            if job.attempts < MAX_ATTEMPTS:
+                job.status = "retrying"
+                job.not_before = time.monotonic() + BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+                with self._cond:
+                    self._pending.append(job)
+            else:
+                job.status = "failed"
+                job.finished_at = time.time()
+                print(f"Background job {job.name} ({job.id}) failed: {e}")
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+            self._notify()
+
+    def _ensure_workers(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 无事件循环（同步上下文），等待 drain() 执行
+            return
+        if loop is self._loop and any(not t.done() for t in self._tasks):
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def _notify(self) -> None:
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wakeup.set()
+        else:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def _worker(self) -> None:
+        while True:
+            job = self._take_ready()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_delay())
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await asyncio.to_thread(self._execute, job)
+
+
+job_queue = JobQueue()
@@ -13,7 +13,9 @@ except ImportError:
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from routers import dishes, orders, suppliers, admin
+from routers import dishes, orders, suppliers, admin, bootstrap
+from jobs import job_queue
+from compression import CompressionMiddleware
 
 app = FastAPI(
     title="萍姐家流动餐 API",
@@ -39,11 +41,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip / brotli 压缩（列表接口另有缓存的压缩响应体，见 compression.cached_json_response）
+app.add_middleware(CompressionMiddleware)
+
 # 注册路由
 app.include_router(dishes.router)
 app.include_router(orders.router)
 app.include_router(suppliers.router)
 app.include_router(admin.router)
+app.include_router(bootstrap.router)
 
 
 @app.get("/")
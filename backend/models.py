@@ -122,3 +122,12 @@ class DashboardStats(BaseModel):
     totalDishes: int
     totalSuppliers: int
     activeOrders: int
+
+
+class BootstrapPayload(BaseModel):
+    """客户端启动数据（未请求的部分为 None，接口返回时省略）"""
+    version: int
+    dishes: Optional[list[Dish]] = None
+    configs: Optional[dict[str, SystemConfig]] = None
+    ingredients: Optional[list[IngredientLibraryItem]] = None
+    suppliers: Optional[list[Supplier]] = None
@@ -1,9 +1,14 @@
 import os
 import uuid
+import asyncio
 from pydantic import BaseModel
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Request
 from models import SystemConfig, DashboardStats, IngredientLibraryItem, Order
 from firebase_client import db, bucket
+from singleflight import read_collection, read_document, forget_document, client_admission
+from jobs import job_queue
+from compression import cached_json_response
+import dish_usage
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -32,14 +37,15 @@ async def admin_login(body: LoginRequest):
 # ==================== 仪表盘 API ====================
 
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[Depends(client_admission)])
 async def get_dashboard_stats():
     """获取仪表盘统计数据（含近期订单）"""
-    orders = db.collection("orders").get()
-    dishes = db.collection("dishes").get()
-    suppliers = db.collection("suppliers").get()
+    order_list, dishes, suppliers = await asyncio.gather(
+        read_collection("orders"),
+        read_collection("dishes"),
+        read_collection("suppliers"),
+    )
 
-    order_list = [o.to_dict() for o in orders]
     active_orders = [o for o in order_list if o.get("status") == "待执行"]
 
     # 按 startDate 降序排列取最近 5 条
@@ -58,42 +64,44 @@ async def get_dashboard_stats():
 # ==================== 系统配置 API ====================
 
 
-@router.get("/config", response_model=list[SystemConfig])
-async def get_all_configs():
+@router.get("/config", response_model=list[SystemConfig], dependencies=[Depends(client_admission)])
+async def get_all_configs(request: Request):
     """获取所有系统配置"""
-    docs = db.collection(CONFIG_COLLECTION).stream()
-    return [doc.to_dict() for doc in docs]
+    configs = await read_collection(CONFIG_COLLECTION)
+    return cached_json_response(request, CONFIG_COLLECTION, configs, list[SystemConfig])
 
 
-@router.get("/config/{config_id}", response_model=SystemConfig)
+@router.get("/config/{config_id}", response_model=SystemConfig, dependencies=[Depends(client_admission)])
 async def get_config(config_id: str):
     """获取指定配置 (如 dish_categories)"""
-    doc = db.collection(CONFIG_COLLECTION).document(config_id).get()
-    if not doc.exists:
+    config = await read_document(CONFIG_COLLECTION, config_id)
+    if config is None:
         return SystemConfig(id=config_id, label="Unknown", values=[])
-    return doc.to_dict()
+    return config
 
 
 @router.post("/config", response_model=SystemConfig)
 async def save_config(config: SystemConfig):
     """保存/更新配置"""
     db.collection(CONFIG_COLLECTION).document(config.id).set(config.model_dump())
+    forget_document(CONFIG_COLLECTION, config.id)
     return config
 
 
 # ==================== 原材料库 API ====================
 
-@router.get("/ingredients", response_model=list[IngredientLibraryItem])
-async def get_all_ingredients():
+@router.get("/ingredients", response_model=list[IngredientLibraryItem], dependencies=[Depends(client_admission)])
+async def get_all_ingredients(request: Request):
     """获取原材料库"""
-    docs = db.collection(INGREDIENTS_COLLECTION).stream()
-    return [doc.to_dict() for doc in docs]
+    items = await read_collection(INGREDIENTS_COLLECTION)
+    return cached_json_response(request, INGREDIENTS_COLLECTION, items, list[IngredientLibraryItem])
 
 
 @router.post("/ingredients", response_model=IngredientLibraryItem)
 async def add_ingredient(item: IngredientLibraryItem):
     """新增原材料"""
     db.collection(INGREDIENTS_COLLECTION).document(item.id).set(item.model_dump())
+    forget_document(INGREDIENTS_COLLECTION, item.id)
     return item
 
 
@@ -101,9 +109,40 @@ async def add_ingredient(item: IngredientLibraryItem):
 async def delete_ingredient(item_id: str):
     """删除原材料"""
     db.collection(INGREDIENTS_COLLECTION).document(item_id).delete()
+    forget_document(INGREDIENTS_COLLECTION, item_id)
     return {"status": "ok"}
 
 
+# ==================== 菜品引用索引 API ====================
+
+
+@router.post("/dish-usage/rebuild", status_code=202)
+async def rebuild_dish_usage():
+    """提交后台任务：全量扫描订单补全菜品 → 订单反向索引，进度见 /api/admin/jobs/{jobId}"""
+    job = job_queue.submit("rebuild_dish_usage", dish_usage.rebuild, with_progress=True)
+    if job.status == "rejected":
+        raise HTTPException(status_code=503, detail="后台任务队列已满，请稍后再试")
+    return {"status": "queued", "jobId": job.id}
+
+
+# ==================== 后台任务 API ====================
+
+
+@router.get("/jobs")
+async def get_jobs_status():
+    """后台任务队列状态（含最近任务）"""
+    return job_queue.stats()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """查询单个后台任务状态"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return job.to_dict()
+
+
 # ==================== 图片上传 API ====================
 
 # 本地上传目录（当 Firebase Storage 未配置时的回退方案）
@@ -131,7 +170,8 @@ async def upload_image(file: UploadFile = File(...)):
         try:
             blob = bucket.blob(f"dish-images/{filename}")
             blob.upload_from_string(file_bytes, content_type=file.content_type)
-            blob.make_public()
+            # 必须在返回 URL 前完成，失败时才能回退到本地存储；在线程中执行以免阻塞事件循环
+            await asyncio.to_thread(blob.make_public)
             return {"imageUrl": blob.public_url}
         except Exception as e:
             print(f"Firebase Storage upload failed, falling back to local: {e}")
@@ -0,0 +1,68 @@
+"""
+客户端启动数据路由 — 一次请求返回菜品、配置、原材料库和供应商
+"""
+import asyncio
+from fastapi import APIRouter, Depends, Query, Request
+from models import BootstrapPayload, SystemConfig
+from firebase_client import db
+from singleflight import reads, read_collection, client_admission
+from compression import cached_json_response
+from routers.dishes import COLLECTION as DISHES_COLLECTION
+from routers.suppliers import COLLECTION as SUPPLIERS_COLLECTION
+from routers.admin import CONFIG_COLLECTION, INGREDIENTS_COLLECTION
+
+router = APIRouter(prefix="/api/bootstrap", tags=["bootstrap"])
+
+# 响应结构变更时递增，客户端据此判断是否兼容
+BOOTSTRAP_VERSION = 1
+
+
+def _load_configs(config_ids: tuple[str, ...]) -> dict[str, dict]:
+    """用一次 get_all 批量读取配置文档"""
+    refs = [db.collection(CONFIG_COLLECTION).document(cid) for cid in config_ids]
+    return {doc.id: doc.to_dict() for doc in db.get_all(refs) if doc.exists}
+
+
+async def _read_configs(config_ids: list[str]) -> dict[str, dict]:
+    ids = tuple(sorted(set(config_ids)))
+    found = await reads.do(f"{CONFIG_COLLECTION}?ids={','.join(ids)}", _load_configs, ids)
+    # 与 GET /api/admin/config/{id} 一致：不存在的配置返回空值
+    return {
+        cid: found.get(cid) or SystemConfig(id=cid, label="Unknown", values=[]).model_dump()
+        for cid in ids
+    }
+
+
+async def _none():
+    return None
+
+
+@router.get("", response_model=BootstrapPayload, dependencies=[Depends(client_admission)])
+async def get_bootstrap(
+    request: Request,
+    dishes: bool = True,
+    suppliers: bool = True,
+    ingredients: bool = True,
+    configs: list[str] = Query(default=[]),
+):
+    """获取启动数据；各部分可通过查询参数开关，如
+    /api/bootstrap?suppliers=false&ingredients=false&configs=dish_categories&configs=event_reasons"""
+    dish_list, config_map, ingredient_list, supplier_list = await asyncio.gather(
+        read_collection(DISHES_COLLECTION) if dishes else _none(),
+        _read_configs(configs) if configs else _none(),
+        read_collection(INGREDIENTS_COLLECTION) if ingredients else _none(),
+        read_collection(SUPPLIERS_COLLECTION) if suppliers else _none(),
+    )
+    sections = {
+        "dishes": dish_list,
+        "configs": config_map,
+        "ingredients": ingredient_list,
+        "suppliers": supplier_list,
+    }
+    # 只省略未请求的顶层部分；嵌套字段的 null 与各资源接口保持一致
+    skipped = {name for name, value in sections.items() if value is None}
+    # 按规范化后的查询参数缓存压缩后的响应体
+    key = (f"bootstrap?dishes={int(dishes)}&suppliers={int(suppliers)}&ingredients={int(ingredients)}"
+           f"&configs={','.join(sorted(set(configs)))}")
+    payload = {"version": BOOTSTRAP_VERSION, **sections}
+    return cached_json_response(request, key, payload, BootstrapPayload, exclude=skipped)
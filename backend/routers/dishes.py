@@ -1,29 +1,53 @@
 """
 菜品 CRUD 路由
 """
-from fastapi import APIRouter, HTTPException
-from models import Dish, DishCreate
+from fastapi import APIRouter, HTTPException, Depends, Request
+from models import Dish, DishCreate, OrderStatus
 from firebase_client import db
+from singleflight import read_collection, read_document, forget_document, client_admission
+from compression import cached_json_response
+import dish_usage
 
 router = APIRouter(prefix="/api/dishes", tags=["dishes"])
 
 COLLECTION = "dishes"
 
 
-@router.get("/", response_model=list[Dish])
-async def get_all_dishes():
+@router.get("/", response_model=list[Dish], dependencies=[Depends(client_admission)])
+async def get_all_dishes(request: Request):
     """获取所有菜品"""
-    docs = db.collection(COLLECTION).stream()
-    return [doc.to_dict() for doc in docs]
+    dishes = await read_collection(COLLECTION)
+    return cached_json_response(request, COLLECTION, dishes, list[Dish])
 
 
-@router.get("/{dish_id}", response_model=Dish)
+@router.get("/{dish_id}", response_model=Dish, dependencies=[Depends(client_admission)])
 async def get_dish(dish_id: str):
     """获取单个菜品"""
-    doc = db.collection(COLLECTION).document(dish_id).get()
-    if not doc.exists:
+    dish = await read_document(COLLECTION, dish_id)
+    if dish is None:
         raise HTTPException(status_code=404, detail="菜品不存在")
-    return doc.to_dict()
+    return dish
+
+
+def _order_summary(order: dict) -> dict:
+    return {
+        "id": order.get("id"),
+        "orderNumber": order.get("orderNumber"),
+        "customerName": order.get("customerName"),
+        "startDate": order.get("startDate"),
+        "status": order.get("status"),
+    }
+
+
+@router.get("/{dish_id}/usage")
+async def get_dish_usage(dish_id: str):
+    """查询引用该菜品的订单"""
+    orders = dish_usage.referencing_orders(dish_id)
+    return {
+        "dishId": dish_id,
+        "orders": [_order_summary(o) for o in orders],
+        "activeOrderIds": [o["id"] for o in orders if o.get("status") == OrderStatus.TO_BE_EXECUTED.value],
+    }
 
 
 @router.post("/", response_model=Dish, status_code=201)
@@ -33,6 +57,7 @@ async def create_dish(dish_data: DishCreate):
     doc_ref = db.collection(COLLECTION).document()
     dish = Dish(id=doc_ref.id, **dish_data.model_dump())
     doc_ref.set(dish.model_dump())
+    forget_document(COLLECTION, dish.id)
     return dish
 
 
@@ -43,14 +68,30 @@ async def update_dish(dish_id: str, dish_data: Dish):
     if not doc_ref.get().exists:
         raise HTTPException(status_code=404, detail="菜品不存在")
     doc_ref.set(dish_data.model_dump())
+    forget_document(COLLECTION, dish_id)
     return dish_data
 
 
 @router.delete("/{dish_id}")
-async def delete_dish(dish_id: str):
-    """删除菜品"""
+async def delete_dish(dish_id: str, force: bool = False):
+    """删除菜品；仍被待执行订单引用时拒绝删除（force=true 可强制删除）"""
     doc_ref = db.collection(COLLECTION).document(dish_id)
     if not doc_ref.get().exists:
         raise HTTPException(status_code=404, detail="菜品不存在")
+
+    orders = dish_usage.referencing_orders(dish_id)
+    active = [o for o in orders if o.get("status") == OrderStatus.TO_BE_EXECUTED.value]
+    if active and not force:
+        numbers = "、".join(o.get("orderNumber", o.get("id", "")) for o in active)
+        raise HTTPException(status_code=409, detail=f"菜品仍被待执行订单引用: {numbers}")
+
     doc_ref.delete()
-    return {"message": "菜品已删除", "id": dish_id}
+    forget_document(COLLECTION, dish_id)
+    if not orders:
+        db.collection(dish_usage.COLLECTION).document(dish_id).delete()
+
+    result = {"message": "菜品已删除", "id": dish_id}
+    if orders:
+        result["warning"] = "该菜品仍被订单引用：这些订单的菜单中该菜品将没有图片和名称，采购清单也不再计入它的原材料"
+        result["orders"] = [_order_summary(o) for o in orders]
+    return result
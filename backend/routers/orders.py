@@ -4,10 +4,15 @@
 import time
 import math
 import random
+from typing import Optional
 from pydantic import BaseModel as _BaseModel
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request
+from firebase_admin import firestore
 from models import Order, OrderCreate, OrderStatus, DayPlan, DayPlanSlots, MealSlot
 from firebase_client import db
+from singleflight import read_collection, read_document, forget_document, client_admission
+from compression import cached_json_response
+import dish_usage
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/api/orders", tags=["orders"])
@@ -15,20 +20,20 @@ router = APIRouter(prefix="/api/orders", tags=["orders"])
 COLLECTION = "orders"
 
 
-@router.get("/", response_model=list[Order])
-async def get_all_orders():
+@router.get("/", response_model=list[Order], dependencies=[Depends(client_admission)])
+async def get_all_orders(request: Request):
     """获取所有订单"""
-    docs = db.collection(COLLECTION).stream()
-    return [doc.to_dict() for doc in docs]
+    orders = await read_collection(COLLECTION)
+    return cached_json_response(request, COLLECTION, orders, list[Order])
 
 
-@router.get("/{order_id}", response_model=Order)
+@router.get("/{order_id}", response_model=Order, dependencies=[Depends(client_admission)])
 async def get_order(order_id: str):
     """获取单个订单"""
-    doc = db.collection(COLLECTION).document(order_id).get()
-    if not doc.exists:
+    order = await read_document(COLLECTION, order_id)
+    if order is None:
         raise HTTPException(status_code=404, detail="订单不存在")
-    return doc.to_dict()
+    return order
 
 
 @router.post("/", response_model=Order, status_code=201)
@@ -69,17 +74,41 @@ async def create_order(order_data: OrderCreate):
         plans=plans,
     )
 
-    db.collection(COLLECTION).document(order_id).set(order.model_dump())
+    # 订单与菜品反向索引在同一个 batch 中写入
+    batch = db.batch()
+    batch.set(db.collection(COLLECTION).document(order_id), order.model_dump())
+    dish_usage.apply_order_change(batch, order_id, set(), dish_usage.dish_ids_in_plans(plans))
+    batch.commit()
+    forget_document(COLLECTION, order_id)
     return order
 
 
+@firestore.transactional
+def _write_order(transaction, order_id: str, data: Optional[dict]) -> bool:
+    """在事务中读取旧排期，写入（data 为 None 时删除）订单并更新菜品反向索引。
+    读和写在同一事务中，并发编辑同一订单时不会基于过期的旧排期更新索引。
+    订单不存在时返回 False。"""
+    doc_ref = db.collection(COLLECTION).document(order_id)
+    snapshot = doc_ref.get(transaction=transaction)
+    if not snapshot.exists:
+        return False
+    old_ids = dish_usage.dish_ids_in_plans(snapshot.to_dict().get("plans"))
+    if data is None:
+        transaction.delete(doc_ref)
+        new_ids = set()
+    else:
+        transaction.set(doc_ref, data)
+        new_ids = dish_usage.dish_ids_in_plans(data.get("plans"))
+    dish_usage.apply_order_change(transaction, order_id, old_ids, new_ids)
+    return True
+
+
 @router.put("/{order_id}", response_model=Order)
 async def update_order(order_id: str, order_data: Order):
     """更新订单"""
-    doc_ref = db.collection(COLLECTION).document(order_id)
-    if not doc_ref.get().exists:
+    if not _write_order(db.transaction(), order_id, order_data.model_dump()):
         raise HTTPException(status_code=404, detail="订单不存在")
-    doc_ref.set(order_data.model_dump())
+    forget_document(COLLECTION, order_id)
     return order_data
 
 
@@ -95,6 +124,7 @@ async def update_order_status(order_id: str, body: _StatusUpdate):
     if not doc.exists:
         raise HTTPException(status_code=404, detail="订单不存在")
     doc_ref.update({"status": body.status})
+    forget_document(COLLECTION, order_id)
     updated = doc_ref.get()
     return updated.to_dict()
 
@@ -102,8 +132,7 @@ async def update_order_status(order_id: str, body: _StatusUpdate):
 @router.delete("/{order_id}")
 async def delete_order(order_id: str):
     """删除订单"""
-    doc_ref = db.collection(COLLECTION).document(order_id)
-    if not doc_ref.get().exists:
+    if not _write_order(db.transaction(), order_id, None):
         raise HTTPException(status_code=404, detail="订单不存在")
-    doc_ref.delete()
+    forget_document(COLLECTION, order_id)
     return {"message": "订单已删除", "id": order_id}
@@ -3,20 +3,22 @@
 """
 import time
 import random
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request
 from models import Supplier
 from firebase_client import db
+from singleflight import read_collection, forget_document, client_admission
+from compression import cached_json_response
 
 router = APIRouter(prefix="/api/suppliers", tags=["suppliers"])
 
 COLLECTION = "suppliers"
 
 
-@router.get("/", response_model=list[Supplier])
-async def get_all_suppliers():
+@router.get("/", response_model=list[Supplier], dependencies=[Depends(client_admission)])
+async def get_all_suppliers(request: Request):
     """获取所有供应商"""
-    docs = db.collection(COLLECTION).stream()
-    return [doc.to_dict() for doc in docs]
+    suppliers = await read_collection(COLLECTION)
+    return cached_json_response(request, COLLECTION, suppliers, list[Supplier])
 
 
 @router.post("/", response_model=Supplier, status_code=201)
@@ -32,6 +34,7 @@ async def create_supplier(supplier_data: Supplier):
         supplier_data.id = f"sup-{int(time.time()*1000)}"
     
     db.collection(COLLECTION).document(supplier_data.id).set(supplier_data.model_dump())
+    forget_document(COLLECTION, supplier_data.id)
     return supplier_data
 
 
@@ -45,6 +48,7 @@ async def update_supplier(supplier_id: str, supplier_data: Supplier):
     # 确保 ID 一致
     supplier_data.id = supplier_id
     doc_ref.set(supplier_data.model_dump())
+    forget_document(COLLECTION, supplier_id)
     return supplier_data
 
 
@@ -55,4 +59,5 @@ async def delete_supplier(supplier_id: str):
     if not doc_ref.get().exists:
         raise HTTPException(status_code=404, detail="供应商不存在")
     doc_ref.delete()
+    forget_document(COLLECTION, supplier_id)
     return {"message": "供应商已删除", "id": supplier_id}
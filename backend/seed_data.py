@@ -4,6 +4,7 @@
 运行方式: python seed_data.py
 """
 from firebase_client import db
+import dish_usage
 
 MOCK_DISHES = [
     {
@@ -123,6 +124,9 @@ def seed():
         db.collection("orders").document(order["id"]).set(order)
         print(f"  ✅ 订单: {order['customerName']} - {order['orderNumber']}")
 
+    print("\n🔗 重建菜品引用索引...")
+    print(f"  ✅ 已索引 {dish_usage.rebuild()} 个菜品")
+
     print("\n🎉 种子数据写入完成！")
 
 
@@ -0,0 +1,111 @@
+"""
+读请求合并（single-flight）与按客户端的准入限制
+
+同一时刻对同一 key 的并发读只触发一次 Firestore 读取，其余请求等待并共享结果；
+单个客户端同时发起的新读取数超过上限时直接返回 429，而不是无限排队；
+加入已有读取的请求不占用额度（如分享链接在群里被同时打开，都来自同一个运营商 NAT IP）。
+"""
+import os
+import asyncio
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+from fastapi import HTTPException, Request
+from firebase_client import db
+
+# 单个客户端允许同时进行中的 Firestore 读取数
+MAX_INFLIGHT_PER_CLIENT = int(os.environ.get("MAX_INFLIGHT_PER_CLIENT", "16"))
+# 是否信任 X-Forwarded-For 识别客户端。Vercel 会覆盖该请求头，可以信任；
+# 本地 uvicorn 等直连部署下客户端可以伪造，默认只在 Vercel 上开启
+TRUST_FORWARDED_FOR = os.environ.get("TRUST_FORWARDED_FOR", "1" if os.environ.get("VERCEL") else "0") == "1"
+
+# 当前请求的客户端标识，由 client_admission 依赖设置
+_current_client: ContextVar[Optional[str]] = ContextVar("singleflight_client", default=None)
+
+
+class SingleFlight:
+    """按 key 合并并发调用：进行中的调用结束前，相同 key 的调用共享同一个结果"""
+
+    def __init__(self, max_per_client: int = MAX_INFLIGHT_PER_CLIENT):
+        self.max_per_client = max_per_client
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._started_by_client: defaultdict[str, int] = defaultdict(int)
+
+    async def do(self, key: str, fn: Callable[..., Any], *args) -> Any:
+        """在线程中执行同步函数 fn(*args)，并发的相同 key 只执行一次。
+        只有发起新读取时才检查当前客户端的并发额度，超限返回 429。"""
+        fut = self._inflight.get(key)
+        if fut is None:
+            client = _current_client.get()
+            if client is not None:
+                if self._started_by_client[client] >= self.max_per_client:
+                    raise HTTPException(status_code=429, detail="请求过于频繁，请稍后再试")
+                self._started_by_client[client] += 1
+            fut = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f, k=key, c=client: self._release(k, f, c))
+        # shield: 某个请求被取消时不影响其他等待者
+        return await asyncio.shield(fut)
+
+    def forget(self, key: str) -> None:
+        """写操作后调用：之后的读不再加入写之前发起的读取"""
+        self._inflight.pop(key, None)
+
+    def forget_prefix(self, prefix: str) -> None:
+        """丢弃所有以 prefix 开头的进行中读取（用于批量读取等派生 key）"""
+        for key in [k for k in self._inflight if k.startswith(prefix)]:
+            del self._inflight[key]
+
+    def _release(self, key: str, fut: asyncio.Future, client: Optional[str]) -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        if client is not None:
+            self._started_by_client[client] -= 1
+            if self._started_by_client[client] <= 0:
+                del self._started_by_client[client]
+
+
+reads = SingleFlight()
+
+
+def _load_collection(collection: str) -> list[dict]:
+    return [doc.to_dict() for doc in db.collection(collection).stream()]
+
+
+def _load_document(collection: str, doc_id: str) -> Optional[dict]:
+    doc = db.collection(collection).document(doc_id).get()
+    return doc.to_dict() if doc.exists else None
+
+
+async def read_collection(collection: str) -> list[dict]:
+    """读取整个集合（并发请求合并为一次读取）"""
+    return await reads.do(collection, _load_collection, collection)
+
+
+async def read_document(collection: str, doc_id: str) -> Optional[dict]:
+    """读取单个文档，不存在时返回 None（并发请求合并为一次读取）"""
+    return await reads.do(f"{collection}/{doc_id}", _load_document, collection, doc_id)
+
+
+def forget_document(collection: str, doc_id: str) -> None:
+    """文档写入后调用，同时丢弃该集合的进行中列表读取和批量读取（key 为 "集合名?..."）"""
+    reads.forget(f"{collection}/{doc_id}")
+    reads.forget(collection)
+    reads.forget_prefix(f"{collection}?")
+
+
+# ==================== 客户端准入限制 ====================
+
+
+def _client_key(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        # 反向代理后真实 IP 在 X-Forwarded-For 的第一段
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def client_admission(request: Request):
+    """路由依赖：标记当前客户端，额度在 SingleFlight.do 发起新读取时检查"""
+    _current_client.set(_client_key(request))
@@ -12,12 +12,14 @@ const ConfigManagement: React.FC = () => {
 
     const loadConfigs = async () => {
         try {
-            const [catData, reasonData] = await Promise.all([
-                api.fetchConfig('dish_categories'),
-                api.fetchConfig('event_reasons')
-            ]);
-            setCategories(catData.values || []);
-            setReasons(reasonData.values || []);
+            const { configs } = await api.fetchBootstrap({
+                dishes: false,
+                suppliers: false,
+                ingredients: false,
+                configs: ['dish_categories', 'event_reasons'],
+            });
+            setCategories(configs?.dish_categories?.values || []);
+            setReasons(configs?.event_reasons?.values || []);
         } catch (error) {
             console.error(error);
         } finally {
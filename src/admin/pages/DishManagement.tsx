@@ -12,14 +12,10 @@ const DishManagement: React.FC = () => {
     const [uploading, setUploading] = useState(false);
 
     useEffect(() => {
-        Promise.all([
-            api.fetchDishes(),
-            api.fetchConfig('dish_categories'),
-            api.fetchIngredientLibrary()
-        ]).then(([dishData, catData, ingData]) => {
-            setDishes(dishData);
-            setCategories(catData.values || []);
-            setIngLibrary(ingData);
+        api.fetchBootstrap({ suppliers: false, configs: ['dish_categories'] }).then((data) => {
+            setDishes(data.dishes || []);
+            setCategories(data.configs?.dish_categories?.values || []);
+            setIngLibrary(data.ingredients || []);
         }).finally(() => setLoading(false));
     }, []);
 
@@ -49,7 +45,7 @@ const DishManagement: React.FC = () => {
             await api.deleteDish(id);
             loadDishes();
         } catch (error) {
-            alert('删除失败');
+            alert(error instanceof Error ? error.message : '删除失败');
         }
     };
 
@@ -111,3 +111,13 @@ export interface DashboardStats {
   activeOrders: number;
   recentOrders?: Order[];
 }
+
+// ==================== 启动数据 ====================
+
+export interface BootstrapPayload {
+  version: number;
+  dishes?: Dish[];
+  configs?: Record<string, SystemConfig>;
+  ingredients?: IngredientLibraryItem[];
+  suppliers?: Supplier[];
+}